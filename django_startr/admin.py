@@ -1,5 +1,10 @@
+from django import forms
+from django.contrib import messages
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IS_POPUP_VAR
 from django.core.validators import URLValidator
 from django.core.exceptions import FieldDoesNotExist
+from django.template.response import TemplateResponse
 #from django.utils.encoding import smart_text
 from django.utils.encoding import smart_str as smart_text
 from django.utils.safestring import mark_safe
@@ -11,10 +16,7 @@ def number_field_choices(field):
     """
         Given a field, returns the number of choices.
     """
-    try:
-        return len(field.get_flat_choices())
-    except AttributeError:
-        return 0
+    return len(getattr(field, "flatchoices", None) or ())
 
 
 def remove_dupes(seq, idfun=None):
@@ -66,6 +68,46 @@ def is_foreignkey(field_name, model):
         return False
 
 
+class BulkUpdateForm(forms.Form):
+    """
+        Form for the bulk update admin action.  Each candidate field gets a "change" checkbox and its model form field;
+        only checked fields are assigned.
+    """
+    send_signals = forms.BooleanField(required=False, label="Save each object (sends signals, much slower)")
+
+    def __init__(self, model_fields, *args, **kwargs):
+        super(BulkUpdateForm, self).__init__(*args, **kwargs)
+        self.model_fields = model_fields
+        for field in model_fields:
+            self.fields["change_%s" % field.name] = forms.BooleanField(required=False,
+                                                                        label="Change %s" % field.verbose_name)
+            formfield = field.formfield()
+            formfield.required = False
+            self.fields[field.name] = formfield
+
+    def get_field_pairs(self):
+        """
+            Returns (change checkbox, value) bound field pairs for the template.
+        """
+        return [(self["change_%s" % field.name], self[field.name]) for field in self.model_fields]
+
+    def clean(self):
+        cleaned_data = super(BulkUpdateForm, self).clean()
+        for field in self.model_fields:
+            if not cleaned_data.get("change_%s" % field.name):
+                continue
+            if cleaned_data.get(field.name) in field.empty_values and not (field.null or field.blank):
+                self.add_error(field.name, "This field is required.")
+        return cleaned_data
+
+    def get_assignments(self):
+        """
+            Returns a dictionary of field name to new value for every checked field.
+        """
+        return {field.name: self.cleaned_data.get(field.name) for field in self.model_fields if
+                self.cleaned_data.get("change_%s" % field.name)}
+
+
 class ExtendedModelAdminMixin(object):
     """
         Model Admin Mixin that makes (hopefully) intelligent choices to minimize the time it takes to get the admin up
@@ -80,6 +122,9 @@ class ExtendedModelAdminMixin(object):
     list_all_select_related = True
     filter_by_fields = ["BooleanField", "NullBooleanField", "USStateField"]
     search_by_fields = ["CharField", "TextField"]
+    bulk_update_action = True
+    bulk_update_fields = None
+    bulk_update_chunk_size = 10000
 
     def __getattr__(cls, name):
         """
@@ -161,16 +206,101 @@ class ExtendedModelAdminMixin(object):
         """
         list_filter = super(ExtendedModelAdminMixin, self).get_list_filter(request)
         if not isinstance(list_filter, list):
-            combined_list_filter = ([field.name for field in self.model._meta.fields if
-                                     (field.get_internal_type() in self.filter_by_fields) or
-                                     (number_field_choices(field) > 0) or
-                                     (field.get_internal_type() == "ForeignKey" and
-                                      field.rel.to.objects.count() <= self.max_related_objects)] +
+            combined_list_filter = ([field.name for field in self.get_filterable_fields()] +
                                     self.extra_list_filter
                                     )
             list_filter = remove_dupes(combined_list_filter)
         return list_filter
 
+    def get_filterable_fields(self):
+        """
+            Returns the model fields that are listed in filter_by_fields, have choices, or are a ForeignKey to a model
+            with no more than max_related_objects objects.
+        """
+        return [field for field in self.model._meta.fields if
+                (field.get_internal_type() in self.filter_by_fields) or
+                (number_field_choices(field) > 0) or
+                (field.get_internal_type() == "ForeignKey" and
+                 field.related_model._default_manager.count() <= self.max_related_objects)]
+
+    def get_bulk_update_fields(self, request):
+        """
+            Returns the model fields the bulk update action can assign.  Defaults to the editable fields picked for
+            list_filter (booleans, choices and small ForeignKeys); set bulk_update_fields to a list of field names to
+            choose them yourself.
+        """
+        if self.bulk_update_fields is not None:
+            return [self.model._meta.get_field(field_name) for field_name in self.bulk_update_fields]
+        return [field for field in self.get_filterable_fields() if field.editable and not field.primary_key]
+
+    def get_actions(self, request):
+        """
+            Adds the bulk_update_selected action for users with change permission when there is something to update.
+            Can be turned off by setting bulk_update_action to False.
+        """
+        actions = super(ExtendedModelAdminMixin, self).get_actions(request)
+        if (self.bulk_update_action and self.actions is not None and IS_POPUP_VAR not in request.GET and
+                self.has_change_permission(request) and self.get_bulk_update_fields(request)):
+            action = type(self).bulk_update_selected
+            actions["bulk_update_selected"] = (action, "bulk_update_selected", action.short_description)
+        return actions
+
+    def bulk_update_selected(self, request, queryset):
+        """
+            Admin action that assigns new values to fields on every selected object with a single UPDATE (or one
+            UPDATE per bulk_update_chunk_size objects) instead of a save per object.  Shows a confirmation page where
+            the fields and values are chosen first.
+        """
+        form = BulkUpdateForm(self.get_bulk_update_fields(request), request.POST if "apply" in request.POST else None,
+                              prefix="bulk")
+        if form.is_bound and form.is_valid():
+            assignments = form.get_assignments()
+            if assignments:
+                count = self.bulk_update(request, queryset, assignments, form.cleaned_data["send_signals"])
+                self.message_user(request, "Successfully updated %d %s." % (
+                    count, self.model._meta.verbose_name if count == 1 else self.model._meta.verbose_name_plural),
+                    messages.SUCCESS)
+                return None
+            self.message_user(request, "No fields were selected to change.", messages.WARNING)
+        context = dict(
+            self.admin_site.each_context(request),
+            title="Change multiple %s" % self.model._meta.verbose_name_plural,
+            opts=self.model._meta,
+            form=form,
+            count=queryset.count(),
+            selected=request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            select_across=request.POST.get("select_across") == "1",
+            action_checkbox_name=helpers.ACTION_CHECKBOX_NAME,
+            media=self.media + form.media,
+        )
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, "admin/django_startr/bulk_update.html", context)
+    bulk_update_selected.short_description = "Change a field on selected %(verbose_name_plural)s"
+
+    def bulk_update(self, request, queryset, assignments, send_signals=False):
+        """
+            Applies assignments to every object in queryset and returns the number of objects updated.
+            Uses queryset.update(), chunked by pk when there are more than bulk_update_chunk_size objects, unless
+            send_signals is True in which case each object is saved (with update_fields) so save signals fire.
+        """
+        if send_signals:
+            count = 0
+            for obj in queryset.iterator():
+                for field_name, value in assignments.items():
+                    setattr(obj, field_name, value)
+                obj.save(update_fields=list(assignments))
+                count += 1
+            return count
+        if not self.bulk_update_chunk_size or queryset.count() <= self.bulk_update_chunk_size:
+            return queryset.update(**assignments)
+        # Read every pk up front; updating can move rows out of a filtered queryset and shift offsets.
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+        count = 0
+        for start in range(0, len(pks), self.bulk_update_chunk_size):
+            chunk = pks[start:start + self.bulk_update_chunk_size]
+            count += self.model._base_manager.using(queryset.db).filter(pk__in=chunk).update(**assignments)
+        return count
+
     def get_search_fields(self, request):
         """
             Automatically creates admin search fields for every field listed in search_by_fields.
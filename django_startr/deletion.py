@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+import tempfile
+import uuid
+from collections import Counter, defaultdict, deque
+
+from django.apps import apps
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import CASCADE, DO_NOTHING, PROTECT, RESTRICT, ProtectedError, RestrictedError, signals
+
+logger = logging.getLogger(__name__)
+
+
+def get_journal_dir():
+    """
+        Returns the directory where in-progress chunked deletes are journaled so they can be resumed.
+        Set settings.STARTR_DELETE_JOURNAL_DIR to somewhere durable in production.
+    """
+    return getattr(settings, "STARTR_DELETE_JOURNAL_DIR", os.path.join(tempfile.gettempdir(), "startr_deletes"))
+
+
+def delete_relations(model):
+    """
+        Returns every relation pointing at model, including the hidden ones from auto-created m2m through tables (for
+        both model's own many-to-many fields and those pointing at it).  Same as Django's
+        get_candidate_relations_to_delete.
+    """
+    return [field for field in model._meta.get_fields(include_hidden=True) if
+            field.auto_created and not field.concrete and (field.one_to_one or field.one_to_many)]
+
+
+def cascade_relations(model):
+    """
+        Returns the relations pointing at model (including auto-created m2m through tables) that cascade on delete.
+    """
+    return [relation for relation in delete_relations(model) if relation.on_delete is CASCADE]
+
+
+def can_raw_delete(model):
+    """
+        Given a model whose cascading dependents have already been deleted, checks if rows can be removed with a single
+        DELETE (no signal listeners, no multi-table inheritance parents, no generic relations and nothing left to
+        SET_NULL/PROTECT etc.).  Mirrors Django's Collector.can_fast_delete.
+    """
+    opts = model._meta
+    if signals.pre_delete.has_listeners(model) or signals.post_delete.has_listeners(model):
+        return False
+    if opts.parents:
+        return False
+    if any(hasattr(field, "bulk_related_objects") for field in opts.private_fields):
+        return False
+    return all(relation.on_delete in (CASCADE, DO_NOTHING) for relation in delete_relations(model))
+
+
+def iter_pk_batches(queryset, batch_size):
+    """
+        Yields the pks of queryset as lists of at most batch_size, streamed in pk order.
+    """
+    batch = []
+    for pk in queryset.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def check_protected(queryset, batch_size=1000):
+    """
+        Raises ProtectedError (or RestrictedError) if a PROTECT (or RESTRICT) foreign key points at a row in queryset or
+        at anything that would cascade from it, so a chunked delete refuses before deleting anything, like
+        Model.delete().  Unlike Django, RESTRICT references are refused even when the referencing row would be deleted
+        through another cascade.
+
+        The cascade is walked level by level in batches of pks, remembering the pks already checked per model so
+        self-references and cycles end.
+    """
+    using = queryset.db
+    checked = defaultdict(set)
+    pending = deque((queryset.model, pks) for pks in iter_pk_batches(queryset, batch_size))
+    while pending:
+        model, pks = pending.popleft()
+        pks = [pk for pk in pks if pk not in checked[model]]
+        if not pks:
+            continue
+        checked[model].update(pks)
+        for relation in delete_relations(model):
+            referencing = relation.related_model._base_manager.using(using).filter(
+                **{"%s__pk__in" % relation.field.name: pks})
+            if relation.on_delete in (PROTECT, RESTRICT):
+                referencing_objects = list(referencing[:10])
+                if referencing_objects:
+                    error = ProtectedError if relation.on_delete is PROTECT else RestrictedError
+                    raise error("Cannot delete some instances of model %r because they are referenced through %s "
+                                "foreign keys: '%s.%s'." % (model.__name__,
+                                                           "protected" if error is ProtectedError else "restricted",
+                                                           relation.related_model.__name__, relation.field.name),
+                                set(referencing_objects))
+            elif relation.on_delete is CASCADE:
+                pending.extend((relation.related_model, dependent_pks) for dependent_pks in
+                               iter_pk_batches(referencing, batch_size))
+
+
+def has_dependents(model, relations, pks, using):
+    """
+        Checks if any rows other than pks themselves still point at pks through the given (cascading) relations of
+        model, e.g. ones added since they were deleted, or the rest of a reference cycle.
+    """
+    for relation in relations:
+        dependents = relation.related_model._base_manager.using(using).filter(
+            **{"%s__pk__in" % relation.field.name: pks})
+        if relation.related_model is model:
+            dependents = dependents.exclude(pk__in=pks)
+        if dependents.exists():
+            return True
+    return False
+
+
+class ChunkedDeleter(object):
+    """
+    Deletes an object and everything that cascades from it in bounded batches, ordered by pk, committing after every
+    batch.  Dependents are always deleted before the rows they point at, so an interrupted delete leaves a consistent
+    database and can simply be run again; every delete is journaled (see get_journal_dir) until it completes so
+    `manage.py startr_delete --resume` can finish it.
+
+    Batches use QuerySet._raw_delete when can_raw_delete allows it and fall back to a regular (signal sending)
+    QuerySet.delete() of the batch otherwise.
+    """
+    batch_size = 1000
+
+    def __init__(self, batch_size=None, progress=None):
+        self.batch_size = batch_size or self.batch_size
+        self.progress = progress
+        self.deleted = Counter()
+
+    def delete(self, obj, using=None):
+        """
+        Deletes obj and its dependents.  Returns (total, {model_label: count}) like Model.delete().
+        """
+        using = using or router.db_for_write(obj.__class__, instance=obj)
+        queryset = obj.__class__._base_manager.using(using).filter(pk=obj.pk)
+        check_protected(queryset, self.batch_size)
+        journal_path = self.write_journal(obj, using)
+        self.delete_queryset(queryset)
+        os.remove(journal_path)
+        return sum(self.deleted.values()), dict(self.deleted)
+
+    def resume(self, journal_path):
+        """
+        Finishes the delete recorded in the given journal file.  The journal is dropped if something now protects the
+        object, since resuming would never succeed.
+        """
+        with open(journal_path) as journal_file:
+            entry = json.load(journal_file)
+        model = apps.get_model(entry["model"])
+        queryset = model._base_manager.using(entry["using"]).filter(pk=entry["pk"])
+        try:
+            check_protected(queryset, self.batch_size)
+        except (ProtectedError, RestrictedError):
+            os.remove(journal_path)
+            raise
+        self.delete_queryset(queryset)
+        os.remove(journal_path)
+        return sum(self.deleted.values()), dict(self.deleted)
+
+    def delete_queryset(self, queryset):
+        """
+        Deletes every row in queryset, batch_size rows at a time, after first deleting each batch's dependents.
+        """
+        while True:
+            pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:self.batch_size])
+            if not pks:
+                return
+            self.delete_batch(queryset.model, pks, queryset.db)
+
+    def delete_batch(self, model, pks, using):
+        """
+        Deletes the rows of model with pks, dependents first.  The cascade is walked depth first with an explicit stack
+        of pk batches rather than recursion, and rows already on the stack aren't collected again, so deep trees,
+        self-references and cycles all end.
+        """
+        stack = [(model, pks)]
+        in_progress = defaultdict(set)
+        in_progress[model].update(pks)
+        while stack:
+            model, pks = stack[-1]
+            dependents = self.next_dependents(model, pks, using, in_progress)
+            if dependents:
+                stack.append(dependents)
+                in_progress[dependents[0]].update(dependents[1])
+                continue
+            stack.pop()
+            in_progress[model].difference_update(pks)
+            self.delete_rows(model, pks, using)
+
+    def next_dependents(self, model, pks, using, in_progress):
+        """
+        Returns (model, pks) for the next batch of rows cascading from pks that aren't already being deleted, or None.
+        """
+        for relation in cascade_relations(model):
+            dependents = relation.related_model._base_manager.using(using).filter(
+                **{"%s__pk__in" % relation.field.name: pks})
+            if in_progress[relation.related_model]:
+                dependents = dependents.exclude(pk__in=in_progress[relation.related_model])
+            dependent_pks = list(dependents.order_by("pk").values_list("pk", flat=True)[:self.batch_size])
+            if dependent_pks:
+                return relation.related_model, dependent_pks
+        return None
+
+    def delete_rows(self, model, pks, using):
+        """
+        Deletes the rows of model with pks in one transaction, raw if nothing else points at them any more.
+        """
+        with transaction.atomic(using=using):
+            batch = model._base_manager.using(using).filter(pk__in=pks)
+            if can_raw_delete(model) and not has_dependents(model, cascade_relations(model), pks, using):
+                count = batch._raw_delete(using)
+            else:
+                count = batch.delete()[1].get(model._meta.label, 0)
+        self.deleted[model._meta.label] += count
+        logger.info("Deleted %d %s (%d so far)", count, model._meta.label, self.deleted[model._meta.label])
+        if self.progress:
+            self.progress(model, count, self.deleted[model._meta.label])
+
+    def write_journal(self, obj, using):
+        """
+        Records the delete of obj so it can be resumed if interrupted.  Returns the journal file path.
+        """
+        journal_dir = get_journal_dir()
+        if not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+        journal_path = os.path.join(journal_dir, "%s.json" % uuid.uuid4().hex)
+        with open(journal_path, 'w') as journal_file:
+            json.dump({"model": obj._meta.label, "pk": str(obj.pk), "using": using}, journal_file)
+        return journal_path
+
+
+def pending_deletes():
+    """
+        Returns the journal file paths of chunked deletes that have not completed.
+    """
+    journal_dir = get_journal_dir()
+    if not os.path.exists(journal_dir):
+        return []
+    return sorted(os.path.join(journal_dir, name) for name in os.listdir(journal_dir) if name.endswith(".json"))
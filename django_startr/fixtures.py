@@ -0,0 +1,301 @@
+import datetime
+import decimal
+import random
+import uuid
+from collections import Counter
+
+import django
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connections, models, router
+from django.utils import timezone
+
+WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliett", "kilo", "lima",
+         "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey",
+         "xray", "yankee", "zulu")
+
+# Field types value_for gives a different value per index when they must be unique.
+UNIQUE_VALUE_FIELDS = (models.CharField, models.TextField, models.IntegerField, models.DecimalField, models.FloatField,
+                       models.UUIDField, models.GenericIPAddressField, models.FileField)
+
+
+def fillable_fields(model):
+    """
+        Returns the concrete fields a generated object needs values for: everything but auto primary keys and
+        auto_now/auto_now_add dates (which Django fills in itself).
+    """
+    return [field for field in model._meta.concrete_fields if not
+            (field.primary_key and isinstance(field, models.AutoField)) and not
+            getattr(field, "auto_now", False) and not getattr(field, "auto_now_add", False)]
+
+
+def unique_field_sets(model):
+    """
+        Returns the tuples of field names whose values must be unique together in model (and its parents): unique
+        fields, unique_together and unconditional UniqueConstraints.
+    """
+    field_sets = []
+    for model_class in [model] + model._meta.get_parent_list():
+        opts = model_class._meta
+        field_sets.extend((field.name,) for field in opts.local_fields if field.unique)
+        field_sets.extend(tuple(together) for together in opts.unique_together)
+        field_sets.extend(tuple(constraint.fields) for constraint in opts.total_unique_constraints)
+    return field_sets
+
+
+def can_generate_unique(field):
+    """
+        Checks if ValueGenerator can give field a different value for every index.  OneToOneFields count, since each
+        object gets its own related object.
+    """
+    if field.is_relation:
+        return field.one_to_one
+    return not field.choices and isinstance(field, UNIQUE_VALUE_FIELDS)
+
+
+class ValueGenerator(object):
+    """
+    Generates type-appropriate values for model fields from the same `_meta` introspection Startr uses to generate
+    forms.  Fields that are unique, alone or together with others, get values derived from index (unique per index
+    where the type allows, see can_generate_unique); everything else comes from a
+    random.Random seeded with seed, and dates are spread over the three years before now, so the same seed (and now)
+    gives the same data.
+    """
+
+    def __init__(self, seed=0, now=None):
+        self.random = random.Random(seed)
+        self.indexes = Counter()
+        self.now = now or timezone.now()
+        self.fields = {}
+        self.unique_field_names = {}
+
+    def next_index(self, model):
+        """
+            Returns the next unused index for model, so objects created in separate calls don't clash on unique fields.
+        """
+        index = self.indexes[model]
+        self.indexes[model] += 1
+        return index
+
+    def words(self, count):
+        return " ".join(self.random.choice(WORDS) for _ in range(count))
+
+    def unique_string(self, prefix, index, max_length, separator="-"):
+        suffix = "%s%d" % (separator, index)
+        if max_length:
+            prefix = prefix[:max(max_length - len(suffix), 0)]
+        return "%s%s" % (prefix, suffix)
+
+    def value_for(self, field, index, unique=None):
+        """
+            Returns a value for a non-relational field.  unique (defaults to field.unique) asks for a value that differs
+            per index, for fields in unique_together or a UniqueConstraint.  Defaults are used for non-unique fields
+            that have one and no choices.
+        """
+        if unique is None:
+            unique = field.unique
+        if field.choices:
+            return self.random.choice([value for value, label in field.flatchoices])
+        if field.has_default() and not unique:
+            return field.get_default()
+        max_length = field.max_length
+        if isinstance(field, models.BooleanField):
+            return self.random.random() < 0.5
+        if isinstance(field, models.UUIDField):
+            return uuid.UUID(int=self.random.getrandbits(128), version=4)
+        if isinstance(field, models.EmailField):
+            return self.unique_string("user", index, max_length and max_length - 12, "") + "@example.com"
+        if isinstance(field, models.URLField):
+            return "https://example.com/%s" % self.unique_string(self.random.choice(WORDS), index, None)
+        if isinstance(field, models.SlugField):
+            return self.unique_string(self.words(2).replace(" ", "-"), index, max_length)
+        if isinstance(field, models.GenericIPAddressField):
+            return "10.%d.%d.%d" % (index // 65536 % 256, index // 256 % 256, index % 256)
+        if isinstance(field, models.FileField):
+            return "" if field.blank and not unique else "startr/placeholder-%d" % index
+        if isinstance(field, models.TextField):
+            if unique:
+                return self.unique_string(self.words(self.random.randint(8, 40)), index, None, " ")
+            return self.words(self.random.randint(8, 40))
+        if isinstance(field, models.CharField):
+            if unique:
+                return self.unique_string(self.words(2), index, max_length, " ")
+            return self.words(3)[:max_length]
+        if isinstance(field, models.DecimalField):
+            if unique:
+                return decimal.Decimal(index).scaleb(-field.decimal_places)
+            whole_digits = max(min(field.max_digits - field.decimal_places, 6), 0)
+            value = decimal.Decimal(self.random.randint(0, 10 ** (whole_digits + field.decimal_places) - 1))
+            return value.scaleb(-field.decimal_places)
+        if isinstance(field, models.FloatField):
+            return float(index) if unique else self.random.uniform(0, 1000)
+        if isinstance(field, models.IntegerField) and "Positive" in field.get_internal_type():
+            return index if unique else self.random.randint(0, 1000)
+        if isinstance(field, models.IntegerField):
+            return index if unique else self.random.randint(-1000, 1000)
+        if isinstance(field, models.DateTimeField):
+            return self.now - datetime.timedelta(seconds=self.random.randint(0, 3 * 365 * 24 * 3600))
+        if isinstance(field, models.DateField):
+            return self.now.date() - datetime.timedelta(days=self.random.randint(0, 3 * 365))
+        if isinstance(field, models.TimeField):
+            return datetime.time(self.random.randint(0, 23), self.random.randint(0, 59))
+        if isinstance(field, models.DurationField):
+            return datetime.timedelta(minutes=self.random.randint(0, 24 * 60))
+        if isinstance(field, models.JSONField):
+            return {}
+        if isinstance(field, models.BinaryField):
+            return b""
+        if field.null:
+            return None
+        return self.unique_string(self.random.choice(WORDS), index, max_length)
+
+    def build(self, model, index, related=None):
+        """
+            Returns an unsaved instance of model.  related maps ForeignKey/OneToOneField names to the object (or pk) to
+            point at; nullable relations that aren't given are left empty.
+        """
+        related = related or {}
+        if model not in self.fields:
+            self.fields[model] = fillable_fields(model)
+            self.unique_field_names[model] = {name for field_set in unique_field_sets(model) for name in field_set}
+        instance = model()
+        for field in self.fields[model]:
+            if field.is_relation:
+                value = related.get(field.name)
+                if value is None:
+                    continue
+                if isinstance(value, models.Model):
+                    setattr(instance, field.name, value)
+                else:
+                    setattr(instance, field.attname, value)
+            else:
+                setattr(instance, field.attname,
+                        self.value_for(field, index, field.name in self.unique_field_names[model]))
+        return instance
+
+
+def reset_sequences(model, using=None):
+    """
+        Moves the database's pk sequence for model past explicitly numbered rows, as loaddata does.
+    """
+    connection = connections[using or router.db_for_write(model)]
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def save_self_referencing(obj, fields):
+    """
+        Saves obj, the first object of its model, pointing the non-nullable ForeignKeys to its own model in fields at
+        itself.  An auto primary key is set explicitly (the table is empty) so it is known before the INSERT.
+    """
+    model = obj.__class__
+    explicit_pk = obj.pk is None
+    if explicit_pk:
+        obj.pk = 1
+    for field in fields:
+        setattr(obj, field.attname, getattr(obj, field.target_field.attname))
+    obj.save(force_insert=True)
+    if explicit_pk:
+        reset_sequences(model, obj._state.db)
+
+
+def create_fixtures(model, count, seed=0, generator=None):
+    """
+        Saves count objects of model and returns them, first creating one object for every model they point at
+        (recursively).  OneToOneFields get a fresh related object per row.  Non-nullable ForeignKeys to model itself
+        point at an existing object, or at the object itself when there is none yet.
+    """
+    generator = generator or ValueGenerator(seed)
+    shared = {}
+    objects = []
+    self_references = [field for field in fillable_fields(model) if
+                       field.is_relation and field.related_model is model and not field.null]
+    for _ in range(count):
+        related = {}
+        for field in fillable_fields(model):
+            if not field.is_relation or field.related_model is model:
+                continue
+            if field.one_to_one:
+                related[field.name] = create_fixtures(field.related_model, 1, generator=generator)[0]
+            else:
+                if field.related_model not in shared:
+                    shared[field.related_model] = create_fixtures(field.related_model, 1, generator=generator)[0]
+                related[field.name] = shared[field.related_model]
+        obj = generator.build(model, generator.next_index(model), related)
+        target = None
+        if self_references:
+            target = objects[0] if objects else model._base_manager.order_by("pk").first()
+        if self_references and target is None:
+            save_self_referencing(obj, self_references)
+        else:
+            for field in self_references:
+                setattr(obj, field.name, target)
+            obj.save()
+        objects.append(obj)
+    return objects
+
+
+def seed_order(seed_models):
+    """
+        Returns seed_models ordered so every model comes after the models its non-nullable ForeignKeys and
+        OneToOneFields point at.  Nullable relations to a model that comes later are left empty.  Raises ValueError
+        if required relations form a cycle.
+    """
+    remaining = list(seed_models)
+    ordered = []
+    while remaining:
+        ready = [model for model in remaining if not
+                 [field for field in fillable_fields(model) if field.is_relation and not field.null and
+                  field.related_model is not model and field.related_model in remaining]]
+        if not ready:
+            raise ValueError("The required relations between %s form a cycle." %
+                             ", ".join(model._meta.label for model in remaining))
+        ordered.extend(ready)
+        remaining = [model for model in remaining if model not in ready]
+    return ordered
+
+
+def sample_values(model, attname, size, rnd, using=None):
+    """
+        Returns up to size values of attname from model's rows, picked uniformly (reservoir sampling) while streaming
+        them in order, so memory doesn't grow with the table and the same rnd state gives the same sample.
+    """
+    sample = []
+    queryset = model._base_manager.using(using).order_by(attname).values_list(attname, flat=True)
+    for seen, value in enumerate(queryset.iterator(chunk_size=10000)):
+        if seen < size:
+            sample.append(value)
+        else:
+            replace = rnd.randint(0, seen)
+            if replace < size:
+                sample[replace] = value
+    return sample
+
+
+def setup_seed_worker():
+    django.setup()
+
+
+def seed_batch(label, start, count, seed, related, one_to_one, using=None, now=None, first_pk=None):
+    """
+        Builds count objects of the model labelled label (with indexes start to start + count - 1) and inserts them
+        with bulk_create.  related maps ForeignKey names to the values to pick from; one_to_one maps OneToOneField
+        names to one value per object.  Auto primary keys are numbered from first_pk when given.  Each batch gets its
+        own generator seeded from seed, label and start, so the data doesn't depend on how batches are spread over
+        worker processes or which finishes first.  Returns count.
+    """
+    model = apps.get_model(label)
+    generator = ValueGenerator("%s:%s:%d" % (seed, label, start), now=now)
+    objects = []
+    for offset in range(count):
+        values = {name: generator.random.choice(choices) for name, choices in related.items() if choices}
+        values.update((name, targets[offset]) for name, targets in one_to_one.items())
+        obj = generator.build(model, start + offset, values)
+        if first_pk is not None:
+            obj.pk = first_pk + offset
+        objects.append(obj)
+    model._base_manager.using(using).bulk_create(objects)
+    return count
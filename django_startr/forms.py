@@ -0,0 +1,184 @@
+from django import forms
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete, post_save
+from django.forms.models import ModelChoiceIterator
+
+
+def get_choices_cache():
+    """
+        Returns the cache the choice lists are kept in, settings.STARTR_CHOICES_CACHE (defaults to "default").
+        Use a shared cache (Redis, Memcached) when running more than one process so invalidation reaches all of them.
+    """
+    return caches[getattr(settings, "STARTR_CHOICES_CACHE", "default")]
+
+
+def choices_cache_key(model):
+    return "startr_choices:%s" % model._meta.label_lower
+
+
+def invalidate_cached_choices(sender, **kwargs):
+    """
+        Signal receiver that drops a model's cached choices whenever one of its objects is saved or deleted.
+    """
+    get_choices_cache().delete(choices_cache_key(sender))
+
+
+def connect_cached_choices_invalidation(model):
+    dispatch_uid = choices_cache_key(model)
+    post_save.connect(invalidate_cached_choices, sender=model, dispatch_uid=dispatch_uid)
+    post_delete.connect(invalidate_cached_choices, sender=model, dispatch_uid=dispatch_uid)
+
+
+def get_cached_objects(model, max_objects):
+    """
+        Returns every object of model from the cache, loading them on a miss, or None if there are more than
+        max_objects of them.  The "too many" answer is cached as well so large tables aren't re-read on every request.
+    """
+    cache = get_choices_cache()
+    key = choices_cache_key(model)
+    objects = cache.get(key)
+    if objects is None:
+        objects = list(model._default_manager.all()[:max_objects + 1])
+        if len(objects) > max_objects:
+            objects = False
+        cache.set(key, objects, getattr(settings, "STARTR_CHOICES_CACHE_TIMEOUT", 300))
+    if objects is False:
+        return None
+    return objects
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    """
+    Iterates the cached objects instead of querying, falling back to the queryset when they aren't cached.
+    """
+
+    def __iter__(self):
+        objects = self.field.get_cached_objects()
+        if objects is None:
+            for choice in super(CachedModelChoiceIterator, self).__iter__():
+                yield choice
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in objects:
+            yield self.choice(obj)
+
+    def __len__(self):
+        objects = self.field.get_cached_objects()
+        if objects is None:
+            return super(CachedModelChoiceIterator, self).__len__()
+        return len(objects) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        objects = self.field.get_cached_objects()
+        if objects is None:
+            return super(CachedModelChoiceIterator, self).__bool__()
+        return self.field.empty_label is not None or bool(objects)
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField for ForeignKeys to small lookup tables (statuses, categories...).  While the related model has no
+    more than max_cached_objects objects (settings.STARTR_MAX_CACHED_CHOICES, defaults to 100 like the admin's
+    max_related_objects) they are kept in the cache framework and used both to render the choices and to validate the
+    submitted value, so neither hits the database.  The cache is dropped whenever an object of the related model is
+    saved or deleted (queryset.update() and bulk_create() don't send signals, so those wait for
+    STARTR_CHOICES_CACHE_TIMEOUT).  Bigger tables, and querysets narrowed by limit_choices_to, behave exactly like a
+    ModelChoiceField.
+    """
+    iterator = CachedModelChoiceIterator
+    max_cached_objects = None
+
+    def __init__(self, queryset, **kwargs):
+        super(CachedModelChoiceField, self).__init__(queryset, **kwargs)
+        connect_cached_choices_invalidation(queryset.model)
+
+    def get_cached_objects(self):
+        if self.queryset.query.has_filters():
+            return None
+        max_objects = self.max_cached_objects or getattr(settings, "STARTR_MAX_CACHED_CHOICES", 100)
+        return get_cached_objects(self.queryset.model, max_objects)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        objects = self.get_cached_objects()
+        if objects is None:
+            return super(CachedModelChoiceField, self).to_python(value)
+        key = self.to_field_name or "pk"
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, key)
+        for obj in objects:
+            if str(getattr(obj, key)) == str(value):
+                return obj
+        raise ValidationError(self.error_messages["invalid_choice"], code="invalid_choice", params={"value": value})
+
+
+def constrained_field_names(model):
+    """
+        Returns the names of model's fields (and its parents') that take part in a unique, unique_together,
+        unique_for_date/month/year or Meta.constraints check.  A constraint whose fields can't be read off it
+        (expressions, CheckConstraint) counts as involving every field.
+    """
+    names = set()
+    for model_class in [model] + model._meta.get_parent_list():
+        opts = model_class._meta
+        for field in opts.local_fields:
+            if field.unique:
+                names.add(field.name)
+            for date_check in ("unique_for_date", "unique_for_month", "unique_for_year"):
+                if getattr(field, date_check, None):
+                    names.update((field.name, getattr(field, date_check)))
+        for together in opts.unique_together:
+            names.update(together)
+        for constraint in opts.constraints:
+            if getattr(constraint, "fields", None):
+                names.update(constraint.fields)
+            else:
+                names.update(field.name for field in model._meta.fields)
+    return names
+
+
+class CachedChoicesFormMixin(object):
+    """
+    ModelForm mixin that skips the model-level existence check (ForeignKey.validate runs a query) for
+    CachedModelChoiceFields whose value was already validated against the cached objects.  Fields in a unique check or
+    constraint keep it, since Django also drops excluded fields from validate_unique() and validate_constraints().
+    """
+
+    def _get_validation_exclusions(self):
+        exclude = super(CachedChoicesFormMixin, self)._get_validation_exclusions()
+        constrained = constrained_field_names(self._meta.model)
+        cached = [name for name, field in self.fields.items() if
+                  isinstance(field, CachedModelChoiceField) and name not in constrained and
+                  field.get_cached_objects() is not None]
+        if isinstance(exclude, set):
+            exclude.update(cached)
+        else:
+            exclude.extend(cached)
+        return exclude
+
+
+def save_changed(form):
+    """
+        Saves a valid ModelForm for an existing object writing only what the user changed: one UPDATE of the changed
+        columns (plus auto_now dates), then only the changed many-to-many fields.  Nothing is written when the form
+        has no changes.  Returns the instance.
+
+        Columns the model's save() fills in itself (e.g. a slug built from the name) aren't in form.changed_data, so
+        add them to update_fields in the view or go back to form.save() for such models.
+    """
+    instance = form.instance
+    if not form.has_changed():
+        return instance
+    changed = set(form.changed_data)
+    update_fields = [field.name for field in instance._meta.concrete_fields if not field.primary_key and
+                     (field.name in changed or getattr(field, "auto_now", False))]
+    if changed.intersection(update_fields):
+        instance.save(update_fields=update_fields)
+    for field in instance._meta.many_to_many:
+        if field.name in changed:
+            field.save_form_data(instance, form.cleaned_data[field.name])
+    return instance
@@ -6,6 +6,7 @@ from django.apps import apps
 from django.urls import reverse, NoReverseMatch
 
 from ...startry import Startr
+from ...profiling import Profiler
 
 
 class Command(BaseCommand):
@@ -17,15 +18,40 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         # Positional arguments
         parser.add_argument('apps_and_models', nargs='+')
+        parser.add_argument('--profile', nargs='?', const='startr_profile', default=None, metavar='PATH_PREFIX',
+                            help="Profile the run and write PATH_PREFIX.prof, PATH_PREFIX.txt (sorted stats) and "
+                                 "PATH_PREFIX.collapsed (flamegraph input).  Defaults to startr_profile.")
+        parser.add_argument('--chunked-delete', action='store_true',
+                            help="Generate DeleteViews that delete large cascades in bounded, separately committed "
+                                 "batches.  Interrupted deletes can be finished with startr_delete --resume.")
+        parser.add_argument('--replica-reads', action='store_true',
+                            help="Generate List and Detail views that read from STARTR_REPLICA_DATABASES "
+                                 "(requires django_startr.replicas.ReplicaRouter).")
+        parser.add_argument('--cached-choices', action='store_true',
+                            help="Generate forms that cache the choices of ForeignKeys to small tables instead of "
+                                 "querying them on every GET and POST.")
 
     def handle(self, *args, **options):
-        ingredients = self.parse_startr_options(options["apps_and_models"])
-        startr = Startr()
-        startr.startr(ingredients)
-        
+        if options["profile"]:
+            with Profiler() as profiler:
+                self.startr(options)
+            for path in profiler.save(options["profile"]):
+                self.stdout.write(self.style.SUCCESS("Profile written to %s" % path))
+        else:
+            self.startr(options)
+
         # Check if login URL is configured
         self.check_login_url()
 
+    def startr(self, options):
+        """
+            Parses the apps and models to startr and startrs them.
+        """
+        ingredients = self.parse_startr_options(options["apps_and_models"])
+        startr = Startr(chunked_delete=options["chunked_delete"], replica_reads=options["replica_reads"],
+                        cached_choices=options["cached_choices"])
+        startr.startr(ingredients)
+
     def parse_startr_options(self, apps_and_models):
         """
             Parses command line options to determine what apps and models for those apps we should startr.
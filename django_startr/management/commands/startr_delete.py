@@ -0,0 +1,51 @@
+from __future__ import print_function
+
+from django.core.management.base import BaseCommand, CommandError
+from django.apps import apps
+from django.db.models import ProtectedError, RestrictedError
+
+from ...deletion import ChunkedDeleter, pending_deletes
+
+
+class Command(BaseCommand):
+    help = ("Deletes objects and everything that cascades from them in bounded, separately committed batches, or "
+            "resumes chunked deletes that were interrupted.\n\nexample: python manage.py startr_delete store.Product 1 2"
+            "\n         python manage.py startr_delete --resume")
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', nargs='?', help="app_label.ModelName")
+        parser.add_argument('pks', nargs='*')
+        parser.add_argument('--resume', action='store_true', help="Finish every interrupted chunked delete.")
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--database', default=None)
+
+    def handle(self, *args, **options):
+        deleter = ChunkedDeleter(batch_size=options["batch_size"], progress=self.report_progress)
+        if options["resume"]:
+            journal_paths = pending_deletes()
+            if not journal_paths:
+                self.stdout.write("No interrupted deletes to resume.")
+            for journal_path in journal_paths:
+                self.stdout.write("Resuming %s" % journal_path)
+                try:
+                    deleter.resume(journal_path)
+                except (ProtectedError, RestrictedError) as e:
+                    self.stdout.write(self.style.ERROR("Dropped %s: %s" % (journal_path, e.args[0])))
+        elif options["model"] and options["pks"]:
+            try:
+                model = apps.get_model(options["model"])
+            except (LookupError, ValueError):
+                raise CommandError("%s is not a model - use app_label.ModelName." % options["model"])
+            manager = model._base_manager.using(options["database"]) if options["database"] else model._base_manager
+            for obj in manager.filter(pk__in=options["pks"]).order_by("pk"):
+                try:
+                    deleter.delete(obj, using=options["database"])
+                except (ProtectedError, RestrictedError) as e:
+                    raise CommandError(e.args[0])
+        else:
+            raise CommandError("Give a model and one or more pks, or --resume.")
+        total = sum(deleter.deleted.values())
+        self.stdout.write(self.style.SUCCESS("Deleted %d objects: %s" % (total, dict(deleter.deleted))))
+
+    def report_progress(self, model, count, deleted):
+        self.stdout.write("  %s: deleted %d (%d so far)" % (model._meta.label, count, deleted))
@@ -0,0 +1,206 @@
+from __future__ import print_function
+
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import reverse, NoReverseMatch
+
+from ...views import iter_url_patterns
+
+
+def percentile(sorted_values, percent):
+    """
+        Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0
+    index = max(int(math.ceil(percent / 100.0 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = ("Load tests the <model>_list and <model>_detail pages Startr generated with concurrent clients and reports "
+            "req/s, p50/p95/p99 latency and error rate per route.  Detail pages are requested with pks/slugs sampled "
+            "from the database.  Without --url the ASGI app is driven in-process; sync views then run one at a time on "
+            "Django's single sync thread, so --concurrency only overlaps async views and middleware there.\n\n"
+            "example: python manage.py startr_load --url http://127.0.0.1:8000 --concurrency 20 --duration 30 --json "
+            "load.json")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=None,
+                            help="Base URL of a running server (e.g. http://127.0.0.1:8000).  Defaults to in-process.")
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--duration', type=float, default=None,
+                            help="Seconds to run for.  Defaults to 10 unless --requests is given.")
+        parser.add_argument('--requests', type=int, default=None,
+                            help="Stop after this many requests (or --duration, if also given, whichever is first).")
+        parser.add_argument('--samples', type=int, default=50, help="Objects to sample per detail route.")
+        parser.add_argument('--routes', default=None, help="Only routes whose name contains this string.")
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--json', default=None, metavar='PATH', help="Also write the results as JSON.")
+
+    def handle(self, *args, **options):
+        targets = self.get_targets(options["samples"], options["routes"])
+        if not targets:
+            raise CommandError("No generated _list or _detail routes found (or none with objects to request).")
+        self.results = {route: {"latencies": [], "errors": 0} for route in targets}
+        self.remaining = options["requests"]
+        self.lock = threading.Lock()
+        duration = options["duration"]
+        if duration is None and options["requests"] is None:
+            duration = 10
+        self.deadline = time.perf_counter() + duration if duration is not None else None
+        self.stdout.write("Loading %d routes with %d clients..." % (len(targets), options["concurrency"]))
+
+        started = time.perf_counter()
+        if options["url"]:
+            self.run_threads(targets, options["url"].rstrip("/"), options["concurrency"], options["timeout"])
+        else:
+            # The in-process client sends Host: testserver, which only the test runner allows.
+            with override_settings(ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ["testserver"]):
+                asyncio.run(self.run_asgi(targets, options["concurrency"]))
+        elapsed = time.perf_counter() - started
+
+        report = self.build_report(elapsed)
+        self.write_table(report)
+        if options["json"]:
+            with open(options["json"], 'w') as json_file:
+                json.dump(report, json_file, indent=2)
+            self.stdout.write(self.style.SUCCESS("Results written to %s" % options["json"]))
+
+    def get_targets(self, samples, routes_filter):
+        """
+            Returns {route name: [paths]} for every generated list and detail URL.  Detail paths are reversed with pks
+            or slugs sampled from the view's model.
+        """
+        targets = {}
+        for namespace, pattern in iter_url_patterns():
+            name = pattern.name or ""
+            if not (name.endswith("_list") or name.endswith("_detail")):
+                continue
+            if routes_filter and routes_filter not in name:
+                continue
+            route = "%s:%s" % (namespace, name) if namespace else name
+            kwarg_names = list(pattern.pattern.regex.groupindex)
+            try:
+                if not kwarg_names:
+                    targets[route] = [reverse(route)]
+                    continue
+                model = pattern.callback.view_class.model
+                values = model._default_manager.order_by("?").values_list(kwarg_names[0], flat=True)[:samples]
+                paths = [reverse(route, kwargs={kwarg_names[0]: value}) for value in values]
+            except (AttributeError, NoReverseMatch) as e:
+                self.stdout.write(self.style.WARNING("Skipping %s: %s" % (route, e)))
+                continue
+            if paths:
+                targets[route] = paths
+        return targets
+
+    def next_request(self, targets):
+        """
+            Picks a random route and path, or returns None when the duration or request count is used up.
+        """
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return None
+        if self.remaining is not None:
+            with self.lock:
+                if self.remaining <= 0:
+                    return None
+                self.remaining -= 1
+        route = random.choice(list(targets))
+        return route, random.choice(targets[route])
+
+    def record(self, route, status, latency):
+        result = self.results[route]
+        with self.lock:
+            result["latencies"].append(latency)
+            if status is None or status >= 400:
+                result["errors"] += 1
+
+    def run_threads(self, targets, base_url, concurrency, timeout):
+        """
+            Requests base_url + path from concurrency threads.
+        """
+        def client():
+            while True:
+                request = self.next_request(targets)
+                if request is None:
+                    return
+                route, path = request
+                started = time.perf_counter()
+                try:
+                    with urlopen(base_url + path, timeout=timeout) as response:
+                        response.read()
+                        status = response.status
+                except HTTPError as e:
+                    status = e.code
+                except Exception:
+                    status = None
+                self.record(route, status, time.perf_counter() - started)
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    async def run_asgi(self, targets, concurrency):
+        """
+            Requests each path from the project's ASGI handler in-process with concurrency asyncio tasks.  Sync views
+            run serialized on one thread (thread_sensitive), so this measures overhead more than parallel throughput -
+            use --url against a real server for that.
+        """
+        client = AsyncClient(raise_request_exception=False)
+
+        async def worker():
+            while True:
+                request = self.next_request(targets)
+                if request is None:
+                    return
+                route, path = request
+                started = time.perf_counter()
+                try:
+                    status = (await client.get(path)).status_code
+                except Exception:
+                    status = None
+                self.record(route, status, time.perf_counter() - started)
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+    def build_report(self, elapsed):
+        report = {"elapsed": elapsed, "routes": {}}
+        for route, result in sorted(self.results.items()):
+            latencies = sorted(result["latencies"])
+            count = len(latencies)
+            report["routes"][route] = {
+                "requests": count,
+                "errors": result["errors"],
+                "error_rate": float(result["errors"]) / count if count else 0,
+                "requests_per_second": count / elapsed if elapsed else 0,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+            }
+        total = sum(route["requests"] for route in report["routes"].values())
+        report["requests"] = total
+        report["requests_per_second"] = total / elapsed if elapsed else 0
+        return report
+
+    def write_table(self, report):
+        row = "%-40s %9s %7s %8s %9s %9s %9s"
+        self.stdout.write(row % ("route", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms"))
+        for route, stats in report["routes"].items():
+            self.stdout.write(row % (route[:40], stats["requests"], stats["errors"],
+                                     "%.1f" % stats["requests_per_second"], "%.1f" % stats["p50_ms"],
+                                     "%.1f" % stats["p95_ms"], "%.1f" % stats["p99_ms"]))
+        self.stdout.write(self.style.SUCCESS("%d requests in %.1fs (%.1f req/s)" % (
+            report["requests"], report["elapsed"], report["requests_per_second"])))
@@ -0,0 +1,238 @@
+from __future__ import print_function
+
+import multiprocessing
+import random
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connections, models, IntegrityError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ...fixtures import (can_generate_unique, fillable_fields, reset_sequences, sample_values, seed_batch, seed_order,
+                         setup_seed_worker, unique_field_sets)
+from .startr import Command as StartrCommand
+
+
+class Command(StartrCommand):
+    help = ("Fills models with generated rows for capacity testing.  Every field gets a type-appropriate value (unique "
+            "slugs, choices, URLs, dates...); models are seeded after the models their required ForeignKeys point at, "
+            "which are picked from a sample of the existing rows.  Rows are inserted with bulk_create in batches, "
+            "optionally from several worker processes, and the same --seed gives the same data.  Many-to-many fields "
+            "are left empty.\n\nexample: python manage.py startr_seed store --count 1000000 --workers 4\n"
+            "         python manage.py startr_seed store:Category,Product --count 100000 --model-count "
+            "store.Category=50")
+
+    def add_arguments(self, parser):
+        parser.add_argument('apps_and_models', nargs='+')
+        parser.add_argument('--count', type=int, default=1000, help="Rows to add to each model.")
+        parser.add_argument('--model-count', action='append', default=[], metavar='APP_LABEL.MODEL=COUNT',
+                            help="Rows to add to one model instead of --count.  Can be repeated.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows built and inserted at a time.")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Worker processes inserting batches (use 1 with SQLite, which locks on writes).")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--now', default=None,
+                            help="ISO datetime generated dates lead up to.  Defaults to the start of today.")
+        parser.add_argument('--relation-sample', type=int, default=10000,
+                            help="Existing rows each ForeignKey picks from.")
+        parser.add_argument('--database', default=None)
+
+    def handle(self, *args, **options):
+        seed_models = []
+        for app_models, app in self.parse_startr_options(options["apps_and_models"]).values():
+            seed_models.extend(model for model in app_models if self.can_seed(model))
+        try:
+            seed_models = seed_order(seed_models)
+        except ValueError as e:
+            raise CommandError(e)
+        counts = self.get_counts(seed_models, options["count"], options["model_count"])
+        self.check_required_relations(seed_models, options["database"])
+        self.check_unique_fields(seed_models, counts)
+        now = self.get_now(options["now"])
+
+        pool = None
+        if options["workers"] > 1:
+            # Forked workers must open their own connections.
+            connections.close_all()
+            pool = multiprocessing.Pool(options["workers"], initializer=setup_seed_worker)
+        started = time.perf_counter()
+        total = 0
+        try:
+            for model in seed_models:
+                total += self.seed_model(model, counts[model], pool, options, now)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("Seeded %d rows in %.1fs (%d rows/s)" % (
+            total, elapsed, total / elapsed if elapsed else 0)))
+
+    def can_seed(self, model):
+        """
+            Proxy and unmanaged models, and multi-table inheritance children (bulk_create can't insert them), are
+            skipped.
+        """
+        if model._meta.proxy or not model._meta.managed or model._meta.parents:
+            self.stdout.write(self.style.WARNING("Skipping %s: bulk_create can't insert proxy, unmanaged or multi-table "
+                                                 "inheritance models." % model._meta.label))
+            return False
+        return True
+
+    def get_counts(self, seed_models, count, model_counts):
+        counts = {model: count for model in seed_models}
+        labels = {model._meta.label_lower: model for model in seed_models}
+        for model_count in model_counts:
+            label, equals, value = model_count.partition("=")
+            if not equals or not value.isdigit() or label.lower() not in labels:
+                raise CommandError("--model-count takes app_label.Model=COUNT for a model being seeded, not %s." %
+                                   model_count)
+            counts[labels[label.lower()]] = int(value)
+        return counts
+
+    def check_required_relations(self, seed_models, using):
+        """
+            Fails before anything is inserted if a required ForeignKey points at a model that isn't being seeded and
+            has no rows.
+        """
+        for model in seed_models:
+            for field in fillable_fields(model):
+                if not field.is_relation or field.null or field.related_model in seed_models:
+                    continue
+                if not field.related_model._base_manager.using(using).exists():
+                    raise CommandError("%s.%s needs %s rows - add some first or seed it too." % (
+                        model._meta.label, field.name, field.related_model._meta.label))
+
+    def check_unique_fields(self, seed_models, counts):
+        """
+            Fails before anything is inserted if a unique field, unique_together or UniqueConstraint only has fields
+            that can't get a different value per row (ForeignKeys, choices, booleans...).  Sets including a field
+            filled in by Django or the database (auto primary keys) are left to it.
+        """
+        for model in seed_models:
+            if counts[model] < 2:
+                continue
+            fillable = fillable_fields(model)
+            for field_set in unique_field_sets(model):
+                fields = [model._meta.get_field(name) for name in field_set]
+                if all(field in fillable for field in fields) and not any(can_generate_unique(field)
+                                                                           for field in fields):
+                    raise CommandError("Can't generate unique values for %s (%s) - seed it some other way." % (
+                        model._meta.label, ", ".join(field_set)))
+
+    def get_now(self, now):
+        if now is None:
+            return timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        parsed = parse_datetime(now)
+        if parsed is None:
+            raise CommandError("--now takes an ISO datetime (e.g. 2024-01-01T00:00:00), not %s." % now)
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            return timezone.make_aware(parsed)
+        if not settings.USE_TZ and timezone.is_aware(parsed):
+            return timezone.make_naive(parsed)
+        return parsed
+
+    def seed_model(self, model, count, pool, options, now):
+        label = model._meta.label
+        using = options["database"]
+        self.stdout.write("Seeding %d %s rows..." % (count, label))
+        related, one_to_one = self.get_relations(model, options)
+        started = last_report = time.perf_counter()
+        seeded = 0
+        pending = deque()
+        try:
+            for batch in self.iter_batches(model, count, related, one_to_one, options, now):
+                if pool is None:
+                    seeded += seed_batch(*batch)
+                else:
+                    pending.append(pool.apply_async(seed_batch, batch))
+                    # Keep a couple of batches per worker queued so memory stays flat however many rows are asked for.
+                    if len(pending) >= options["workers"] * 2:
+                        seeded += pending.popleft().get()
+                if time.perf_counter() - last_report > 5:
+                    last_report = time.perf_counter()
+                    self.stdout.write("  %s: %d/%d (%d rows/s)" % (label, seeded, count,
+                                                                  seeded / (last_report - started)))
+            while pending:
+                seeded += pending.popleft().get()
+        except IntegrityError as e:
+            raise CommandError("Inserting %s rows failed: %s.  The rows already inserted (%d %s and the models before "
+                               "it) were kept." % (label, e, seeded, label))
+        reset_sequences(model, using)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("  %s: %d rows in %.1fs" % (label, seeded, elapsed)))
+        return seeded
+
+    def get_relations(self, model, options):
+        """
+            Returns ({ForeignKey name: sampled values of the field it points at}, [OneToOneFields]).  Relations to
+            models that will be seeded later, and nullable self-references, are left empty.
+        """
+        rnd = random.Random("%s:%s" % (options["seed"], model._meta.label))
+        related = {}
+        one_to_one = []
+        for field in fillable_fields(model):
+            if not field.is_relation:
+                continue
+            if field.one_to_one:
+                one_to_one.append(field)
+                continue
+            if field.related_model is model and field.null:
+                continue
+            values = sample_values(field.related_model, field.target_field.attname, options["relation_sample"], rnd,
+                                   options["database"])
+            if values:
+                related[field.name] = values
+            elif not field.null:
+                raise CommandError("%s.%s needs %s rows to point at." % (
+                    model._meta.label, field.name, field.related_model._meta.label))
+        return related, one_to_one
+
+    def iter_batches(self, model, count, related, one_to_one, options, now):
+        """
+            Yields seed_batch arguments for count rows.  Objects are numbered on from the current row count so unique
+            values don't clash with earlier runs, and auto primary keys are given explicitly (on from the highest one)
+            so rows get the same pks whichever batch is inserted first.  OneToOneFields are handed the target rows
+            nothing points at yet, in order; seeding stops early when they run out.
+        """
+        using = options["database"]
+        manager = model._base_manager.using(using)
+        start = manager.count()
+        first_pk = None
+        if isinstance(model._meta.pk, models.AutoField):
+            first_pk = (manager.aggregate(max_pk=models.Max("pk"))["max_pk"] or 0) + 1
+        last_targets = {}
+        remaining = count
+        while remaining > 0:
+            size = min(options["batch_size"], remaining)
+            targets = {}
+            for field in one_to_one:
+                targets[field.name] = self.free_targets(model, field, last_targets.get(field.name), size, using)
+                size = min(size, len(targets[field.name]))
+            if not size:
+                self.stdout.write(self.style.WARNING("  Stopping %s early: every %s row already has one." % (
+                    model._meta.label, "/".join(field.related_model._meta.label for field in one_to_one))))
+                return
+            for name, values in targets.items():
+                targets[name] = values[:size]
+                last_targets[name] = values[size - 1]
+            yield (model._meta.label, start, size, options["seed"], related, targets, using, now, first_pk)
+            if first_pk is not None:
+                first_pk += size
+            start += size
+            remaining -= size
+
+    def free_targets(self, model, field, after, limit, using):
+        """
+            Returns up to limit values of the field field points at from rows no model row points at yet, after the
+            last value already handed out.
+        """
+        attname = field.target_field.attname
+        taken = model._base_manager.using(using).filter(**{"%s__isnull" % field.attname: False}).values(field.attname)
+        queryset = field.related_model._base_manager.using(using).exclude(**{"%s__in" % attname: taken})
+        if after is not None:
+            queryset = queryset.filter(**{"%s__gt" % attname: after})
+        return list(queryset.order_by(attname).values_list(attname, flat=True)[:limit])
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from .profiling import Profiler
+from .replicas import READ_METHODS, get_sticky_cookie_name, get_sticky_seconds
+
+# cProfile can only profile one request at a time (on Python 3.12+ a second one fails to start).
+profiler_lock = threading.Lock()
+
+
+class ProfilerMiddleware(object):
+    """
+    Profiles a single request when `?_profile=1` is added to the URL and either DEBUG is True or the user is staff.
+    Instead of the page, a Startr debug page is returned with the sorted cProfile stats and a link to download the
+    collapsed stacks (`?_profile=collapsed`) for flamegraph tools.  `?_profile_sort=tottime` changes the sort order
+    (any pstats sort key; unknown ones fall back to cumulative).
+
+    If settings.STARTR_PROFILE_DIR is set, every profiled request is also saved there (see Profiler.save).
+
+    Only one request is profiled at a time; others asking for a profile meanwhile get a 503 "profiler busy" response.
+
+    Add 'django_startr.middleware.ProfilerMiddleware' to MIDDLEWARE after AuthenticationMiddleware.
+    """
+    query_param = "_profile"
+    sort_param = "_profile_sort"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        if not profiler_lock.acquire(blocking=False):
+            return self.profiler_busy()
+        try:
+            profiler = Profiler(sort_by=request.GET.get(self.sort_param))
+            try:
+                profiler.start()
+            except ValueError:
+                return self.profiler_busy()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+        finally:
+            profiler_lock.release()
+
+        profile_dir = getattr(settings, "STARTR_PROFILE_DIR", None)
+        saved_paths = []
+        if profile_dir:
+            name = "%s-%s" % (request.path.strip("/").replace("/", "_") or "root", time.strftime("%Y%m%d-%H%M%S"))
+            saved_paths = profiler.save(os.path.join(profile_dir, name))
+
+        if request.GET[self.query_param] == "collapsed":
+            collapsed = HttpResponse(profiler.collapsed_stacks(), content_type="text/plain; charset=utf-8")
+            collapsed["Content-Disposition"] = 'attachment; filename="profile.collapsed"'
+            return collapsed
+
+        query = request.GET.copy()
+        query[self.query_param] = "collapsed"
+        context = {
+            "request_path": request.path,
+            "status_code": response.status_code,
+            "duration_ms": profiler.duration * 1000,
+            "sample_count": sum(profiler.samples.values()),
+            "sort_by": profiler.sort_by,
+            "stats_report": profiler.stats_report(),
+            "collapsed_url": "%s?%s" % (request.path, query.urlencode()),
+            "saved_paths": saved_paths,
+        }
+        return HttpResponse(render_to_string("technical_profile.html", context, request=request))
+
+    def profiler_busy(self):
+        return HttpResponse("Profiler busy - another request is being profiled.  Try again in a moment.",
+                            status=503, content_type="text/plain; charset=utf-8")
+
+    def should_profile(self, request):
+        """
+        Only profile when asked to, and only for staff users unless DEBUG is on.
+        """
+        if self.query_param not in request.GET:
+            return False
+        if settings.DEBUG:
+            return True
+        user = getattr(request, "user", None)
+        return bool(user is not None and user.is_staff)
+
+
+class ReplicaStickyMiddleware(object):
+    """
+    After a user writes (any successful non-GET/HEAD/OPTIONS request, including admin saves) sets a short-lived cookie
+    that keeps their reads on the primary database, so they see their own changes while the replicas catch up.
+    See django_startr.replicas.
+
+    Add 'django_startr.middleware.ReplicaStickyMiddleware' to MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in READ_METHODS and response.status_code < 400:
+            response.set_cookie(get_sticky_cookie_name(), "1", max_age=get_sticky_seconds(), httponly=True,
+                                samesite="Lax")
+        return response
@@ -0,0 +1,121 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class Profiler(object):
+    """
+    Profiles a block of work with cProfile while a background thread samples the profiled thread's stack.
+    The cProfile data gives a sorted stats report and the samples give collapsed stacks
+    ("frame;frame;frame count" lines) that flamegraph.pl, speedscope and friends can read directly.
+
+    Usage:
+        with Profiler() as profiler:
+            do_something_slow()
+        print(profiler.stats_report())
+    """
+    sort_by = "cumulative"
+    sample_interval = 0.001
+    limit = 60
+
+    def __init__(self, sort_by=None, sample_interval=None, limit=None):
+        # Unknown sort keys (e.g. a mistyped ?_profile_sort=) fall back to the default instead of failing in pstats.
+        if sort_by in pstats.Stats.sort_arg_dict_default:
+            self.sort_by = sort_by
+        self.sample_interval = sample_interval or self.sample_interval
+        self.limit = limit or self.limit
+        self.profile = None
+        self.samples = Counter()
+        self.duration = 0
+        self._thread_id = None
+        self._stop = None
+        self._sampler = None
+        self._started_at = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        """
+        Starts the sampler thread and enables cProfile for the calling thread.
+        """
+        self.profile = cProfile.Profile()
+        self.samples = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="startr-profiler-sampler")
+        self._sampler.daemon = True
+        self._sampler.start()
+        self._started_at = time.perf_counter()
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Python 3.12+ refuses when another profiler (or coverage/debugger) is already active.
+            self._stop.set()
+            self._sampler.join()
+            raise
+
+    def stop(self):
+        """
+        Disables cProfile and waits for the sampler thread to finish.
+        """
+        self.profile.disable()
+        self.duration = time.perf_counter() - self._started_at
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        """
+        Records the profiled thread's current stack every sample_interval seconds until stopped.
+        """
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append("%s:%s:%d" % (code.co_filename, code.co_name, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                # Collapsed stack format is space separated, so frames themselves must not contain spaces.
+                self.samples[";".join(reversed(stack)).replace(" ", "_")] += 1
+
+    def stats_report(self):
+        """
+        Returns the cProfile stats sorted by sort_by and limited to the top limit entries.
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.strip_dirs().sort_stats(self.sort_by).print_stats(self.limit)
+        return stream.getvalue()
+
+    def collapsed_stacks(self):
+        """
+        Returns the sampled stacks in collapsed ("folded") format, one stack per line followed by its sample count.
+        """
+        return "".join("%s %d\n" % (stack, count) for stack, count in sorted(self.samples.items()))
+
+    def save(self, path_prefix):
+        """
+        Writes <path_prefix>.prof (raw cProfile data, for snakeviz etc.), <path_prefix>.txt (sorted stats report)
+        and <path_prefix>.collapsed (flamegraph input).  Returns the list of paths written.
+        """
+        directory = os.path.dirname(path_prefix)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        paths = ["%s.prof" % path_prefix, "%s.txt" % path_prefix, "%s.collapsed" % path_prefix]
+        self.profile.dump_stats(paths[0])
+        with open(paths[1], 'w') as report_file:
+            report_file.write(self.stats_report())
+        with open(paths[2], 'w') as collapsed_file:
+            collapsed_file.write(self.collapsed_stacks())
+        return paths
@@ -0,0 +1,110 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_database = ContextVar("startr_read_database", default=None)
+
+
+def get_primary_database():
+    """
+        Returns the alias all writes go to.  Set settings.STARTR_PRIMARY_DATABASE to change it from "default".
+    """
+    return getattr(settings, "STARTR_PRIMARY_DATABASE", "default")
+
+
+def get_replica_databases():
+    """
+        Returns the aliases reads may be sent to, from settings.STARTR_REPLICA_DATABASES.
+    """
+    return list(getattr(settings, "STARTR_REPLICA_DATABASES", []))
+
+
+def get_primary_only_apps():
+    """
+        Returns the app labels whose models are always read from the primary, even inside use_replica().
+        Sessions and users default to the primary so a lagging replica can't log someone out right after they log in.
+        Set settings.STARTR_PRIMARY_ONLY_APPS to change them.
+    """
+    return list(getattr(settings, "STARTR_PRIMARY_ONLY_APPS", ["sessions", "auth"]))
+
+
+def get_sticky_cookie_name():
+    return getattr(settings, "STARTR_REPLICA_STICKY_COOKIE", "startr_use_primary")
+
+
+def get_sticky_seconds():
+    """
+        Returns how long a user's reads stay on the primary after they write, so they read their own changes even if
+        the replicas are lagging.  Set settings.STARTR_REPLICA_STICKY_SECONDS to change it from 5 seconds.
+    """
+    return getattr(settings, "STARTR_REPLICA_STICKY_SECONDS", 5)
+
+
+@contextmanager
+def use_replica(alias=None):
+    """
+        Sends reads made inside the block to alias, or a random replica if not given.  Does nothing when no replicas
+        are configured.
+    """
+    replicas = get_replica_databases()
+    if alias is None and replicas:
+        alias = random.choice(replicas)
+    token = _read_database.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter(object):
+    """
+    Database router that keeps every write (and every read by default) on the primary database and only sends reads
+    to a replica inside use_replica(), which ReplicaReadMixin wraps around read-only views.
+
+    Add to settings.py:
+        DATABASE_ROUTERS = ['django_startr.replicas.ReplicaRouter']
+        STARTR_REPLICA_DATABASES = ['replica']
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in get_primary_only_apps():
+            return None
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return get_primary_database()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = [get_primary_database()] + get_replica_databases()
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+            Replicas get their schema from the primary.
+        """
+        if db in get_replica_databases():
+            return False
+        return None
+
+
+class ReplicaReadMixin(object):
+    """
+    View mixin that sends the view's reads, including the ones made while rendering its template, to a replica.
+    Requests that aren't reads, and requests from users who wrote something in the last few seconds (see
+    django_startr.middleware.ReplicaStickyMiddleware), stay on the primary.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in READ_METHODS or get_sticky_cookie_name() in request.COOKIES:
+            return super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs)
+        with use_replica():
+            response = super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs)
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        return response
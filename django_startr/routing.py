@@ -0,0 +1,77 @@
+import re
+
+from django.urls import URLResolver
+from django.urls.resolvers import RegexPattern, RoutePattern
+from django.utils.functional import cached_property
+
+REGEX_SPECIAL_CHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def literal_first_segment(pattern):
+    """
+        Returns the literal first path segment a URL pattern requires (e.g. "products" for r'^products/' or
+        'products/<int:pk>/'), or None if the first segment isn't a fixed string followed by a "/".
+    """
+    if isinstance(pattern, RegexPattern):
+        regex = pattern._regex
+        if not regex.startswith("^"):
+            return None
+        segment, slash, rest = regex[1:].partition("/")
+        if not slash or REGEX_SPECIAL_CHARACTERS.search(segment):
+            return None
+        return segment
+    if isinstance(pattern, RoutePattern):
+        segment, slash, rest = str(pattern).partition("/")
+        if not slash or "<" in segment:
+            return None
+        return segment
+    return None
+
+
+class PrefixDispatchResolver(URLResolver):
+    """
+    URLResolver that looks up the first segment of the path in a dict of its children's literal prefixes instead of
+    trying every child's regex in turn.  Only the children with that prefix and the children without a literal prefix
+    (captures, catch-alls) are tried, in their original order, so what resolves and what reverse() returns are exactly
+    the same as with a plain include - but resolving no longer slows down as more models are added.
+
+    Build one with prefix_dispatch().
+    """
+
+    @cached_property
+    def segment_resolvers(self):
+        """
+            Returns ({segment: URLResolver over that segment's candidates}, URLResolver over the unprefixed children).
+        """
+        by_segment = {}
+        unprefixed = []
+        for index, pattern in enumerate(self.url_patterns):
+            segment = literal_first_segment(pattern.pattern)
+            if segment is None:
+                unprefixed.append((index, pattern))
+            else:
+                by_segment.setdefault(segment, []).append((index, pattern))
+        resolvers = {segment: self.clone_with(sorted(candidates + unprefixed, key=lambda item: item[0]))
+                     for segment, candidates in by_segment.items()}
+        return resolvers, self.clone_with(unprefixed)
+
+    def clone_with(self, indexed_patterns):
+        return URLResolver(self.pattern, [pattern for index, pattern in indexed_patterns], self.default_kwargs,
+                           self.app_name, self.namespace)
+
+    def resolve(self, path):
+        path = str(path)
+        match = self.pattern.match(path)
+        if not match:
+            return super(PrefixDispatchResolver, self).resolve(path)
+        resolvers, unprefixed = self.segment_resolvers
+        segment = match[0].split("/", 1)[0]
+        return resolvers.get(segment, unprefixed).resolve(path)
+
+
+def prefix_dispatch(urlpatterns):
+    """
+        Wraps urlpatterns in a PrefixDispatchResolver.  Use at the end of a urls.py with many includes:
+            urlpatterns = prefix_dispatch(urlpatterns)
+    """
+    return [PrefixDispatchResolver(RegexPattern(r'^'), list(urlpatterns))]
@@ -14,8 +14,20 @@ class Startr(object):
     """
     Given a dictionary of apps and models, Startr will startr up a bunch of files that will help get your new app up
     and running quickly.
+
+    Options:
+        chunked_delete: generated DeleteViews delete dependents in bounded batches (see django_startr.deletion)
+                        instead of collecting the whole cascade in memory and deleting it in one transaction.
+        replica_reads: generated List and Detail views read from replica databases (see django_startr.replicas).
+        cached_choices: generated forms use cached choice lists for ForeignKeys to small tables
+                        (see django_startr.forms.CachedModelChoiceField).
     """
 
+    def __init__(self, chunked_delete=False, replica_reads=False, cached_choices=False):
+        self.chunked_delete = chunked_delete
+        self.replica_reads = replica_reads
+        self.cached_choices = cached_choices
+
     def startr(self, apps_and_models):
         """
         Iterates a dictionary of apps and models and creates all the necessary files to get up and running quickly.
@@ -24,6 +36,8 @@ class Startr(object):
             models, app = models_app
             models = list(models)
             model_names = {model.__name__: self.get_field_names_for_model(model) for model in models}
+            form_models = [(model.__name__, model_names[model.__name__], self.get_cached_choice_field_names(model))
+                           for model in models]
             self.create_directories(app)
             #self.create_debug_404_template(app)
             self.create_init_files(app, model_names.keys(), models)
@@ -31,10 +45,15 @@ class Startr(object):
             for file_name in ["forms", "admin"]:
                 file_path = "%s/%s.py" % (app.path, file_name)
                 template_path = "django_startr/%s" % (file_name)
-                self.create_file_from_template(file_path, template_path, {"model_names": model_names})
+                self.create_file_from_template(file_path, template_path, {
+                    "model_names": model_names,
+                    "form_models": form_models,
+                    "uses_cached_choices": any(cached_fields for _, _, cached_fields in form_models),
+                })
             for model in models:
                 model_attributes = self.model_attributes(app, model)
                 self.create_files_from_templates(model_attributes)
+            self.create_test_files(app, models)
 
         self.ensure_debug_urls_in_project("/project/our_site/our_site/urls.py")
 
@@ -48,6 +67,17 @@ class Startr(object):
                 field.concrete and (not field.is_relation or field.one_to_one or
                                     (field.many_to_one and field.related_model))]
 
+    def get_cached_choice_field_names(self, model):
+        """
+        Returns the ForeignKey fields that should use cached choices (none unless cached_choices is on).
+        ForeignKeys with limit_choices_to are skipped since their choices depend on the filter.
+        """
+        if not self.cached_choices:
+            return []
+        field_names = self.get_field_names_for_model(model)
+        return [field.name for field in model._meta.get_fields() if field.name in field_names and
+                field.many_to_one and field.related_model and not field.remote_field.limit_choices_to]
+
     def create_directories(self, app):
         """
         If not already there, adds a directory for views, urls and templates.
@@ -129,7 +159,10 @@ class Startr(object):
             'model_fields': self.get_field_names_for_model(model),
             'slug_field': slug_field,
             'slug_field_name': slug_field_name,
-            'lookup_field': lookup_field
+            'lookup_field': lookup_field,
+            'chunked_delete': self.chunked_delete,
+            'replica_reads': self.replica_reads,
+            'model_meta_name': model._meta.model_name,
         }
 
     def create_files_from_templates(self, model_attributes):
@@ -158,6 +191,26 @@ class Startr(object):
             new_file.write(get_template(template_path).render(context_variables))
             print("\033[92m" + "successfully startrd " + file_path + "\033[0m")
 
+    def create_test_files(self, app, models):
+        """
+        Creates a tests package with a performance test module per model and the query count / response time budgets
+        they check (tests/performance_budgets.json).  Skipped if the app still has a tests.py, which would clash.
+        """
+        if os.path.exists("%s/tests.py" % app.path):
+            print("\033[91m" + "%s/tests.py exists.  Skipping performance tests." % app.path + "\033[0m")
+            return
+        directory_path = "%s/tests" % app.path
+        if not os.path.exists(directory_path):
+            os.makedirs(directory_path)
+        self.create_file_from_template("%s/__init__.py" % directory_path, "django_startr/__init__tests", {})
+        self.create_file_from_template("%s/performance_budgets.json" % directory_path,
+                                       "django_startr/performance_budgets",
+                                       {"model_name_slugs": [self.camel_to_slug(model.__name__) for model in models]})
+        for model in models:
+            model_attributes = self.model_attributes(app, model)
+            file_path = "%s/test_%s_performance.py" % (directory_path, model_attributes['model_name_slug'])
+            self.create_file_from_template(file_path, "django_startr/tests", model_attributes)
+
     def remove_empty_startapp_files(self, app):
         """
         Removes 'empty' (less than or equal to 4 lines) views, admin, and tests files.
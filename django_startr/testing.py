@@ -0,0 +1,91 @@
+import json
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, NoReverseMatch
+
+from .fixtures import create_fixtures
+
+DEFAULT_BUDGET = {"queries": 20, "ms": 1000}
+
+
+def load_budgets(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as budgets_file:
+        return json.load(budgets_file)
+
+
+def record_budget(path, key, route, queries, ms):
+    """
+        Writes the measured query count (exact) and response time (with headroom) as route's budget.
+    """
+    budgets = load_budgets(path)
+    budgets.setdefault(key, {})[route] = {"queries": queries, "ms": max(int(ms * 4), 250)}
+    with open(path, 'w') as budgets_file:
+        json.dump(budgets, budgets_file, indent=4, sort_keys=True)
+        budgets_file.write("\n")
+
+
+class PerformanceTestMixin(object):
+    """
+    TestCase mixin for the performance tests Startr generates.  Creates fixture_count objects of model (see
+    django_startr.fixtures) and a superuser, and checks each request against the query count and response time
+    budget recorded for it in budgets_path:
+
+        {"product": {"list": {"queries": 7, "ms": 500}, ...}, ...}
+
+    Run the tests with STARTR_RECORD_BUDGETS=1 to write the measured numbers to the file instead of checking them.
+    """
+    model = None
+    budgets_path = None
+    budget_key = None
+    fixture_count = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        super(PerformanceTestMixin, cls).setUpTestData()
+        cls.objects = create_fixtures(cls.model, cls.fixture_count)
+        cls.object = cls.objects[0]
+        user_model = get_user_model()
+        cls.user = user_model._default_manager.create_superuser(
+            **{user_model.USERNAME_FIELD: "startr-performance", "password": "startr-performance"})
+
+    def setUp(self):
+        super(PerformanceTestMixin, self).setUp()
+        self.client.force_login(self.user)
+
+    def reverse_or_skip(self, viewname, args=None):
+        try:
+            return reverse(viewname, args=args)
+        except NoReverseMatch:
+            self.skipTest("%s is not in the URLconf." % viewname)
+
+    def assertWithinBudget(self, route, url, method="get", data=None, status_code=200, warm_up=True):
+        """
+            Requests url and fails if it returns anything but status_code or takes more queries or milliseconds than
+            route's budget.  GETs are made once first, unmeasured, so template and URL loading isn't counted.
+        """
+        request = getattr(self.client, method)
+        if warm_up:
+            request(url, data)
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            started = time.perf_counter()
+            response = request(url, data)
+            ms = (time.perf_counter() - started) * 1000
+        self.assertEqual(response.status_code, status_code)
+
+        if os.environ.get("STARTR_RECORD_BUDGETS"):
+            record_budget(self.budgets_path, self.budget_key, route, len(queries), ms)
+            return response
+
+        budget = dict(DEFAULT_BUDGET, **load_budgets(self.budgets_path).get(self.budget_key, {}).get(route, {}))
+        self.assertLessEqual(len(queries), budget["queries"], "%s %s made %d queries (budget %d):\n%s" % (
+            method.upper(), url, len(queries), budget["queries"],
+            "\n".join(query["sql"] for query in queries.captured_queries)))
+        self.assertLessEqual(ms, budget["ms"], "%s %s took %dms (budget %dms)" % (
+            method.upper(), url, ms, budget["ms"]))
+        return response
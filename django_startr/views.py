@@ -48,6 +48,34 @@ def register_view(request):
         
     return render(request, 'registration/register.html', {'form': form})
 
+def iter_url_patterns(patterns=None, namespace=None):
+    """
+    Walks the URL tree depth first, descending into includes, and yields (namespace, URLPattern) for every view.
+    The namespace is the full "outer:inner" namespace to reverse the pattern's name with (or None).
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            child_namespace = ":".join(ns for ns in [namespace, pattern.namespace] if ns) or None
+            for item in iter_url_patterns(pattern.url_patterns, child_namespace):
+                yield item
+        elif isinstance(pattern, URLPattern):
+            yield namespace, pattern
+
+def flatten_empty_includes(patterns):
+    """
+    Replaces includes with an empty prefix (such as django_startr.routing.prefix_dispatch) by their children, so the
+    URL walk below sees the patterns they contain.
+    """
+    flattened = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver) and not str(pattern.pattern).lstrip("^"):
+            flattened.extend(flatten_empty_includes(pattern.url_patterns))
+        else:
+            flattened.append(pattern)
+    return flattened
+
 def debug_index(request, exception=None):
     """
     A custom debug view to replace Django's default 404 debug page.
@@ -64,7 +92,7 @@ def debug_index(request, exception=None):
 
     # Get the root URL resolver and start with the top-level patterns
     resolver = get_resolver()
-    patterns = resolver.url_patterns
+    patterns = flatten_empty_includes(resolver.url_patterns)
 
     # Break the current path into segments (ignoring empty segments)
     segments = [seg for seg in base_path.strip("/").split("/") if seg]
@@ -79,7 +107,7 @@ def debug_index(request, exception=None):
                 # Check if this include's prefix (as a regex or route) matches the segment.
                 regex = getattr(pattern.pattern, "regex", None)
                 if regex and regex.match(seg + "/"):
-                    matched_patterns = pattern.url_patterns
+                    matched_patterns = flatten_empty_includes(pattern.url_patterns)
                     prefix_matched_count = i + 1
                     found = True
                     break